@@ -4,44 +4,49 @@
 from __future__ import annotations
 
 import argparse
-import re
+from collections.abc import Iterator
 from pathlib import Path
 
-SECTION_RE = re.compile(r"^##\s+(?P<title>.+?)\s*$")
 
+def _iter_sections(data: bytes, offset: int = 0) -> Iterator[tuple[bytes, int, int]]:
+    """Yield (title, line_start, line_end) for every H2 header from offset on."""
+    # Jump between "##" occurrences with bytes.find instead of visiting
+    # every line; only those hits are checked for being a header.
+    pos = data.find(b"##", offset)
+    while pos != -1:
+        line_start = data.rfind(b"\n", 0, pos) + 1
+        line_end = data.find(b"\n", pos)
+        if line_end == -1:
+            line_end = len(data)
+        # H2 headers only: optional indentation, then "##" followed by
+        # whitespace (so "###" never matches) and a non-empty title.
+        if not data[line_start:pos].strip() and data[pos + 2 : pos + 3].isspace():
+            title = data[pos + 2 : line_end].strip()
+            if title:
+                yield title, line_start, line_end
+        pos = data.find(b"##", line_end)
 
-def extract_latest_release_section(changelog_text: str) -> str:
-    lines = changelog_text.splitlines()
-    sections: list[tuple[str, int, int]] = []
 
-    start_idx: int | None = None
-    title: str | None = None
-    for idx, line in enumerate(lines):
-        match = SECTION_RE.match(line.strip())
-        if not match:
-            continue
-        if start_idx is not None and title is not None:
-            sections.append((title, start_idx, idx))
-        start_idx = idx
-        title = match.group("title").strip()
-
-    if start_idx is not None and title is not None:
-        sections.append((title, start_idx, len(lines)))
-
-    if not sections:
+def extract_latest_release_section(data: bytes) -> str:
+    # Locate section boundaries on the raw bytes and decode only the
+    # chosen section; the rest of the changelog is never decoded.
+    sections = _iter_sections(data)
+    first = next(sections, None)
+    if first is None:
         raise ValueError("No release sections (## ...) found in changelog")
 
     # Prefer first non-Unreleased section; fallback to first section if needed.
-    chosen = next(
-        (
-            section
-            for section in sections
-            if not section[0].lower().startswith("unreleased")
-        ),
-        sections[0],
-    )
-    _, start, end = chosen
-    snippet = "\n".join(lines[start:end]).strip()
+    chosen = first
+    while chosen[0].lower().startswith(b"unreleased"):
+        chosen = next(sections, None)
+        if chosen is None:
+            chosen = first
+            break
+    _, start, header_end = chosen
+    following = next(_iter_sections(data, header_end), None)
+    end = following[1] if following is not None else len(data)
+
+    snippet = data[start:end].decode("utf-8").replace("\r\n", "\n").strip()
     if not snippet:
         raise ValueError("Selected changelog section is empty")
     return snippet + "\n"
@@ -66,10 +71,18 @@ def main() -> int:
     changelog_path = Path(args.changelog)
     output_path = Path(args.output)
 
-    text = changelog_path.read_text(encoding="utf-8")
-    notes = extract_latest_release_section(text)
-    output_path.write_text(notes, encoding="utf-8")
-    print(f"Wrote {output_path}")
+    notes = extract_latest_release_section(changelog_path.read_bytes())
+    payload = notes.encode("utf-8")
+    try:
+        existing = output_path.read_bytes()
+    except FileNotFoundError:
+        existing = None
+    # Leave identical notes untouched so their mtime does not change.
+    if existing == payload:
+        print(f"{output_path} already matches {changelog_path}")
+    else:
+        output_path.write_bytes(payload)
+        print(f"Wrote {output_path}")
     return 0
 
 
@@ -9,6 +9,7 @@ import subprocess
 import sys
 import tomllib
 from dataclasses import dataclass
+from functools import cache
 from importlib import metadata
 from pathlib import Path
 from typing import Annotated
@@ -43,6 +44,7 @@ app = typer.Typer(
 )
 
 
+@cache
 def _project_version() -> str:
     try:
         return metadata.version("ftbatch-bulk-edit")
@@ -88,9 +90,15 @@ def _state(ctx: typer.Context) -> CLIState:
     return CLIState(debug=False, progress=None)
 
 
+@cache
+def _stderr_is_terminal() -> bool:
+    # Probed once per process; the attached stream does not change mid-run.
+    return console.is_terminal and sys.stderr.isatty()
+
+
 def _progress_enabled(progress: bool | None) -> bool:
     if progress is None:
-        return console.is_terminal and sys.stderr.isatty()
+        return _stderr_is_terminal()
     return progress
 
 
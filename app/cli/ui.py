@@ -139,6 +139,18 @@ class CLIRuntimeUI:
                 "import",
                 description=f"Applying workbook edits (0/{max(total, 1)})",
             )
+        elif event == "row_progress":
+            # Periodic tick while a large sheet is applied; the bar still only
+            # advances when the sheet is done.
+            index = int(payload.get("index", 0))
+            total = int(payload.get("total", 1))
+            sheet = str(payload.get("sheet", "sheet"))
+            rows = int(payload.get("rows", 0))
+            self.ensure_task("import", "Applying workbook edits", total=total)
+            self.update_task(
+                "import",
+                description=f"Applying workbook edits ({index}/{max(total, 1)}) - {sheet}: {rows} rows",
+            )
         elif event == "sheet_done":
             index = int(payload.get("index", 0))
             total = int(payload.get("total", 1))
@@ -2,6 +2,8 @@
 Shared constants and utilities.
 """
 
+from functools import cache
+
 NAMESPACE = "urn:Rockwell/MasterRecipe"
 NSMAP = {None: NAMESPACE}
 
@@ -28,3 +30,40 @@ EXCEL_COLUMNS = [
     "FormulaValueLimit_HighHighValue",
     "FormulaValueLimit_HighHighHighValue",
 ]
+
+# The fixed FormulaValueLimit_* columns, for hash lookups instead of prefix tests.
+FVL_COLUMNS = frozenset(c for c in EXCEL_COLUMNS if c.startswith("FormulaValueLimit_"))
+
+# Clark-notation ("{namespace}Local") tags, built once for element lookups.
+NS_PREFIX = f"{{{NAMESPACE}}}"
+TAG_NAME = NS_PREFIX + "Name"
+TAG_PARAMETER = NS_PREFIX + "Parameter"
+TAG_FORMULA_VALUE = NS_PREFIX + "FormulaValue"
+TAG_STEP = NS_PREFIX + "Step"
+TAG_STEPS = NS_PREFIX + "Steps"
+TAG_PARAM_EXPRESSION = NS_PREFIX + "ParamExpression"
+TAG_FORMULA_VALUE_LIMIT = NS_PREFIX + "FormulaValueLimit"
+TAG_RECIPE_ELEMENT_ID = NS_PREFIX + "RecipeElementID"
+TAG_STEP_RECIPE_ID = NS_PREFIX + "StepRecipeID"
+
+_NS_PREFIX_LEN = len(NS_PREFIX)
+
+
+@cache
+def qn(name: str) -> str:
+    """
+    Return the Clark-notation tag for a recipe-namespace local name.
+
+    Column names are a small closed set, so each tag string is built once and
+    the same object is reused for every row.
+    """
+    return NS_PREFIX + name
+
+
+def local_name(tag: str) -> str:
+    """
+    Return the local part of a Clark-notation tag without building a QName.
+    """
+    if tag.startswith(NS_PREFIX):
+        return tag[_NS_PREFIX_LEN:]
+    return tag.rpartition("}")[2]
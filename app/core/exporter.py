@@ -2,12 +2,16 @@
 ExcelExporter: export RecipeTree instances to an .xlsx workbook.
 """
 
-import os
 import logging
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
 from core.base import EXCEL_COLUMNS
 
+# Hash lookup for "is this a fixed column?" instead of scanning the list per key.
+_FIXED_COLUMNS = frozenset(EXCEL_COLUMNS)
+
 
 class ExcelExporter:
     """
@@ -21,8 +25,9 @@ class ExcelExporter:
         Header row is formatted with Arial 10pt bold black on #F2F2F2,
         and panes are frozen below the header, and columns auto-resize to fit content.
 
-        This method accepts either a single RecipeTree or a list of them, then removes the default
-        OpenPyXL sheet and prepares a new workbook.  It iterates each tree, calls each node's
+        This method accepts either a single RecipeTree or a list of them and prepares a write-only
+        OpenPyXL workbook, which avoids building a Cell object per value (rows are still
+        collected in memory before they are appended).  It iterates each tree, calls each node's
         `to_excel_row()` to build a flat dict, and collects any extra columns beyond the fixed
         schema.  After logging how many rows each sheet will have, it writes a header row (fixed
         columns + sorted extras) followed by one row per node.  Finally, it saves the workbook to
@@ -32,53 +37,66 @@ class ExcelExporter:
         log = logging.getLogger(__name__)
         if not isinstance(trees, list):
             trees = [trees]
-        wb = Workbook()
-        wb.remove(wb.active)
+        wb = Workbook(write_only=True)
 
-        all_extras = set()
+        all_columns = set()
         sheet_data = {}
         for t in trees:
             rows = []
             for node in t.parameters + t.formula_values:
                 row = node.to_excel_row()
                 rows.append(row)
-                all_extras.update(k for k in row if k not in EXCEL_COLUMNS)
-            sheet = os.path.basename(t.filepath)
+                all_columns.update(row)
+            sheet = t.filename
             sheet_data[sheet] = rows
             log.info("Prepared %d rows for sheet %s", len(rows), sheet)
 
-        extras = sorted(all_extras)
+        extras = sorted(all_columns - _FIXED_COLUMNS)
         header = EXCEL_COLUMNS + extras
 
         # styling objects
         header_font = Font(name="Arial", size=10, bold=True, color="000000")
         header_fill = PatternFill("solid", fgColor="F2F2F2")
 
-        for sheet, rows in sheet_data.items():
+        col_idx = {col: i for i, col in enumerate(header)}
+        blank = [""] * len(header)
+
+        for sheet in list(sheet_data):
             ws = wb.create_sheet(sheet)
-            # write header
-            ws.append(header)
-            # apply formatting
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
+            # Once the header is known, each row becomes a fixed-order list and
+            # the sheet's dict rows are dropped before the next sheet is built.
+            # Only the keys a row actually has are placed; the rest stay blank.
+            # Column widths are measured in the same pass: write-only sheets
+            # emit them ahead of the rows, so they must be known up front.
+            widths = [len(str(col)) for col in header]
+            values = []
+            for row in sheet_data.pop(sheet):
+                line = blank.copy()
+                for col, value in row.items():
+                    i = col_idx[col]
+                    line[i] = value
+                    if value is not None:
+                        length = len(str(value))
+                        if length > widths[i]:
+                            widths[i] = length
+                values.append(line)
+            for i, width in enumerate(widths, start=1):
+                ws.column_dimensions[get_column_letter(i)].width = width + 2
             # freeze panes below header
             ws.freeze_panes = "A2"
 
-            # write data rows
-            for row in rows:
-                ws.append([row.get(col, "") for col in header])
+            # write formatted header
+            header_cells = []
+            for col in header:
+                cell = WriteOnlyCell(ws, value=col)
+                cell.font = header_font
+                cell.fill = header_fill
+                header_cells.append(cell)
+            ws.append(header_cells)
 
-            # Auto-size columns
-            for col_cells in ws.columns:
-                max_length = 0
-                column_letter = col_cells[0].column_letter
-                for cell in col_cells:
-                    if cell.value is not None:
-                        length = len(str(cell.value))
-                        if length > max_length:
-                            max_length = length
-                ws.column_dimensions[column_letter].width = max_length + 2
+            # write data rows
+            for line in values:
+                ws.append(line)
 
         wb.save(excel_path)
         log.info("Excel written to %s", excel_path)
@@ -2,13 +2,65 @@
 ExcelImporter: apply changes from an Excel workbook into RecipeTree models.
 """
 
-import os
+import re
+import sys
 import logging
 from collections.abc import Callable
-from collections import defaultdict
 from openpyxl import load_workbook
-from utils.string import safe_strip
 from utils.errors import ValidationError
+from utils.string import safe_strip
+
+
+# TagType values, interned so rows can be dispatched by identity.
+_PARAMETER = sys.intern("Parameter")
+_FORMULA_VALUE = sys.intern("FormulaValue")
+
+# Rows between "row_progress" events; sheet sizes are never probed up front.
+_ROW_PROGRESS_EVERY = 1024
+
+# Step name inside a FormulaValue FullPath (".../Steps/Step[<name>]/...").
+_STEP_SEARCH = re.compile(r"/Steps/Step\[([^\]]*)").search
+
+
+def _type_count(row: tuple, type_cols: list) -> int:
+    """
+    Count the data-type cells of a row that hold a value.
+    """
+    # Most of these cells are empty (None), so test them inline instead of
+    # stripping each one.
+    cnt = 0
+    for i in type_cols:
+        v = row[i]
+        if v is not None and (not isinstance(v, str) or v.strip()):
+            cnt += 1
+    return cnt
+
+
+def _counted(rows, tick: Callable[[int], None]):
+    """
+    Yield rows unchanged, calling tick(count) every _ROW_PROGRESS_EVERY rows.
+    """
+    for count, row in enumerate(rows, start=1):
+        yield row
+        # Resumed only when the caller asks for the next row, so ticks report
+        # rows it has finished with, blank ones included.
+        if count % _ROW_PROGRESS_EVERY == 0:
+            tick(count)
+
+
+def _step_bucket(fv_stats: dict, step: str) -> dict:
+    """
+    Return the per-step FormulaValue counters, creating them on first use.
+    """
+    bucket = fv_stats.get(step)
+    if bucket is None:
+        bucket = fv_stats[step] = {
+            "Created": 0,
+            "Updated": 0,
+            "Deleted": 0,
+            "Deferrals": 0,
+        }
+    return bucket
 
 
 class ExcelImporter:
@@ -43,13 +95,28 @@ class ExcelImporter:
             ValidationError: Aggregated validation errors found in Excel rows.
         """
         log = logging.getLogger(__name__)
-        debug_enabled = log.isEnabledFor(logging.DEBUG)  # noqa: F841
+        # Per-row debug arguments are only computed when DEBUG is on.
+        debug_enabled = log.isEnabledFor(logging.DEBUG)
 
         def _emit(event: str, **payload) -> None:
             if progress_cb is not None:
                 progress_cb(event, payload)
 
-        wb = load_workbook(excel_path)
+        step_names = {}
+
+        def _step(fullpath: str) -> str:
+            # Step name of a FormulaValue FullPath, parsed once per path; rows and
+            # deletes ask for the same paths repeatedly.
+            step = step_names.get(fullpath)
+            if step is None:
+                m = _STEP_SEARCH(fullpath)
+                step = m.group(1) if m else ""
+                step_names[fullpath] = step
+            return step
+
+        # Rows are only read once, front to back: stream them instead of
+        # building the workbook's cell model, and read cached formula results.
+        wb = load_workbook(excel_path, read_only=True, data_only=True)
         errors = []
 
         # Overall stats of total changes to xmls
@@ -65,196 +132,277 @@ class ExcelImporter:
         log.debug("Importing Excel changes to XML(s)")
 
         # Map sheet name to RecipeTree by basename
-        tree_map = {os.path.basename(t.filepath): t for t in trees}
+        tree_map = {t.filename: t for t in trees}
         total_sheets = len(wb.sheetnames)
         _emit("start", total=total_sheets)
 
-        for index, sheet in enumerate(wb.sheetnames, start=1):
-            if sheet not in tree_map:
-                log.warning("No matching XML for sheet '%s', skipping", sheet)
-                _emit("sheet_skipped", index=index, total=total_sheets, sheet=sheet)
-                continue
-
-            log.debug(f"Sheet {sheet}")
-            _emit("sheet_start", index=index, total=total_sheets, sheet=sheet)
-
-            # initialize sheet‐level stats
-            sheet_stats = {
-                "Parameters": {"Created": 0, "Updated": 0, "Deleted": 0},
-                "FormulaValues": defaultdict(
-                    lambda: {"Created": 0, "Updated": 0, "Deleted": 0, "Deferrals": 0}
-                ),
-            }
-            detailed[sheet] = sheet_stats
-
-            tree = tree_map[sheet]
-            ws = wb[sheet]
-            header = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
-
-            excel_param_names = set()
-            seen_params = set()
-            seen_fvs = set()
-
-            for r_idx, row in enumerate(
-                ws.iter_rows(min_row=2, values_only=True), start=2
-            ):
-                row_dict = dict(zip(header, [v if v is not None else "" for v in row]))
-                fp = row_dict.get("FullPath", "").strip()
-                tagtype = row_dict.get("TagType", "").strip()
-
-                # Validate single-type
-                types = ["Real", "Integer", "String", "EnumerationSet", "Defer"]
-                cnt = sum(bool(safe_strip(row_dict.get(t))) for t in types)
-                if cnt > 2:
-                    log.error(
-                        f"{sheet}!Row{r_idx}: expected exactly one data type for {fp}"
-                    )
-                    errors.append(
-                        f"{sheet}!Row{r_idx}: expected exactly one data type for {fp}"
-                    )
+        # Read-only workbooks keep the archive open until closed explicitly.
+        try:
+            for index, sheet in enumerate(wb.sheetnames, start=1):
+                if sheet not in tree_map:
+                    log.warning("No matching XML for sheet '%s', skipping", sheet)
+                    _emit("sheet_skipped", index=index, total=total_sheets, sheet=sheet)
                     continue
 
-                if tagtype == "Parameter":
-                    excel_param_names.add(row_dict["Name"].strip())
-                    node = tree.find_parameter(fp)
-                    log.debug(f"\tWorking on Parameter: {row_dict["Name"].strip()}")
-                    if node:
-                        if node.update_from_dict(row_dict):
+                log.debug("Sheet %s", sheet)
+                _emit("sheet_start", index=index, total=total_sheets, sheet=sheet)
+
+                # initialize sheet‐level stats
+                sheet_stats = {
+                    "Parameters": {"Created": 0, "Updated": 0, "Deleted": 0},
+                    "FormulaValues": {},
+                }
+                detailed[sheet] = sheet_stats
+
+                tree = tree_map[sheet]
+                ws = wb[sheet]
+                # Don't trust the stored dimension: a stale one would silently
+                # truncate rows or columns while streaming.
+                ws.reset_dimensions()
+                # One streaming pass: the first row is the header, the rest are data.
+                rows = ws.iter_rows(values_only=True)
+                # Interned so every row dict shares the same key objects.
+                header = [
+                    sys.intern(h) if isinstance(h, str) else h for h in next(rows, ())
+                ]
+                width = len(header)
+                # Resolve the columns read on every row to positions once; the
+                # row dict is only built for rows that reach a node.
+                col = {name: i for i, name in enumerate(header)}
+                i_fullpath = col.get("FullPath")
+                i_tagtype = col.get("TagType")
+                i_defer = col.get("Defer")
+                type_cols = [
+                    col[t]
+                    for t in ("Real", "Integer", "String", "EnumerationSet", "Defer")
+                    if t in col
+                ]
+
+                # First pass: every Parameter name on the sheet, so a Defer target
+                # resolves whether its row comes before or after the FormulaValue.
+                i_name = col.get("Name")
+                excel_param_names = set()
+                # Only rows the loop below accepts as Parameters are collected.
+                if i_name is not None and i_tagtype is not None:
+                    for row in ws.iter_rows(min_row=2, values_only=True):
+                        if not any(row):
+                            continue
+                        if len(row) < width:
+                            row += (None,) * (width - len(row))
+                        if safe_strip(row[i_tagtype]) != _PARAMETER:
+                            continue
+                        if _type_count(row, type_cols) > 2:
+                            continue
+                        excel_param_names.add(safe_strip(row[i_name]))
+                excel_param_names = frozenset(excel_param_names)
+
+                seen_params = set()
+                seen_fvs = set()
+
+                # Bound once; the row loop below runs for every line of the sheet.
+                param_stats = sheet_stats["Parameters"]
+                fv_stats = sheet_stats["FormulaValues"]
+                find_parameter = tree.find_parameter
+                find_formulavalue = tree.find_formulavalue
+                intern = sys.intern
+
+                def _tick(count, index=index, sheet=sheet):
+                    _emit(
+                        "row_progress",
+                        index=index,
+                        total=total_sheets,
+                        sheet=sheet,
+                        rows=count,
+                    )
+
+                # Spreadsheet row number, counted by hand (header is row 1).
+                r_idx = 1
+                for row in _counted(rows, _tick):
+                    r_idx += 1
+                    # Rows with no values at all (gaps, or trailing cells that only
+                    # carry formatting) are not data; skip them before validation.
+                    if not any(row):
+                        continue
+                    # Without a dimension, streamed rows stop at their last stored
+                    # cell; pad so every header column is present.
+                    if len(row) < width:
+                        row += (None,) * (width - len(row))
+                    # Interned like node fullpaths, so lookups against them match
+                    # on identity before comparing characters.
+                    fp = row[i_fullpath] if i_fullpath is not None else None
+                    fp = intern(fp.strip()) if fp else ""
+                    tagtype = row[i_tagtype] if i_tagtype is not None else None
+                    tagtype = intern(tagtype.strip()) if tagtype else ""
+
+                    # Validate single-type.
+                    if _type_count(row, type_cols) > 2:
+                        msg = f"{sheet}!Row{r_idx}: expected exactly one data type for {fp}"
+                        log.error("%s", msg)
+                        errors.append(msg)
+                        continue
+
+                    if tagtype is _PARAMETER or tagtype is _FORMULA_VALUE:
+                        # Nodes read every column, so build the dict directly
+                        # rather than going through an intermediate list.
+                        row_dict = {
+                            h: "" if v is None else v for h, v in zip(header, row)
+                        }
+
+                    if tagtype is _PARAMETER:
+                        node = find_parameter(fp)
+                        if debug_enabled:
                             log.debug(
-                                "\tParameter found in XML (updating)"  # updating data to: {row_dict=}"
+                                "\tWorking on Parameter: %s", row_dict["Name"].strip()
                             )
-                            stats["updated"] += 1
-                            sheet_stats["Parameters"]["Updated"] += 1
+                        if node:
+                            if node.update_from_dict(row_dict):
+                                log.debug(
+                                    "\tParameter found in XML (updating)"  # updating data to: {row_dict=}"
+                                )
+                                stats["updated"] += 1
+                                param_stats["Updated"] += 1
+                            else:
+                                log.debug(
+                                    "\tParameter found in XML (no changes found)"  # updating data to: {row_dict=}"
+                                )
                         else:
+                            tree.create_parameter(row_dict)
                             log.debug(
-                                "\tParameter found in XML (no changes found)"  # updating data to: {row_dict=}"
+                                "\tParameter NOT found in XML (creating)"  # creating parameter with: {row_dict=}"
                             )
-                    else:
-                        tree.create_parameter(row_dict)
-                        log.debug(
-                            "\tParameter NOT found in XML (creating)"  # creating parameter with: {row_dict=}"
-                        )
-                        stats["created"] += 1
-                        sheet_stats["Parameters"]["Created"] += 1
-                    seen_params.add(fp)
-
-                elif tagtype == "FormulaValue":
-                    node = tree.find_formulavalue(fp)
-                    defer = row_dict.get("Defer", "").strip()
-                    log.debug(f"\tWorking on FormulaValue: {row_dict["Name"].strip()}")
-
-                    # determine step for stats
-                    step = fp.split("/Steps/Step[", 1)[1].split("]")[0]
-
-                    # if defer and not tree.has_parameter_named(defer):
-                    if defer and defer not in excel_param_names:
-                        log.error(
-                            f"{sheet}!Row{r_idx}: defer target '{defer}' not found for {fp}"
-                        )
-                        errors.append(
-                            f"{sheet}!Row{r_idx}: defer target '{defer}' not found for {fp}"
-                        )
-                        continue
-                    if node:
-                        if node.update_from_dict(row_dict):
+                            stats["created"] += 1
+                            param_stats["Created"] += 1
+                        seen_params.add(fp)
+
+                    elif tagtype is _FORMULA_VALUE:
+                        node = find_formulavalue(fp)
+                        defer = row[i_defer] if i_defer is not None else None
+                        defer = defer.strip() if defer else ""
+                        if debug_enabled:
                             log.debug(
-                                "\tFormulaValue found in XML (updating)"  # , updating data to: {row_dict=}"
+                                "\tWorking on FormulaValue: %s",
+                                row_dict["Name"].strip(),
                             )
-                            stats["updated"] += 1
-                            sheet_stats["FormulaValues"][step]["Updated"] += 1
-                            if defer:
-                                sheet_stats["FormulaValues"][step]["Deferrals"] += 1
+
+                        # determine step for stats
+                        step = _step(fp)
+
+                        # if defer and not tree.has_parameter_named(defer):
+                        if defer and defer not in excel_param_names:
+                            msg = f"{sheet}!Row{r_idx}: defer target '{defer}' not found for {fp}"
+                            log.error("%s", msg)
+                            errors.append(msg)
+                            continue
+                        if node:
+                            if node.update_from_dict(row_dict):
+                                log.debug(
+                                    "\tFormulaValue found in XML (updating)"  # , updating data to: {row_dict=}"
+                                )
+                                stats["updated"] += 1
+                                bucket = _step_bucket(fv_stats, step)
+                                bucket["Updated"] += 1
+                                if defer:
+                                    bucket["Deferrals"] += 1
+                            else:
+                                log.debug(
+                                    "\tFormulaValue found in XML (no change)"  # , updating data to: {row_dict=}"
+                                )
                         else:
+                            tree.create_formulavalue(row_dict)
                             log.debug(
-                                "\tFormulaValue found in XML (no change)"  # , updating data to: {row_dict=}"
+                                "\tFormulaValue NOT found in XML (creating)"  # , creating with: {row_dict=}"
                             )
+                            stats["created"] += 1
+                            bucket = _step_bucket(fv_stats, step)
+                            bucket["Created"] += 1
+                            if defer:
+                                bucket["Deferrals"] += 1
+                        seen_fvs.add(fp)
                     else:
-                        tree.create_formulavalue(row_dict)
-                        log.debug(
-                            "\tFormulaValue NOT found in XML (creating)"  # , creating with: {row_dict=}"
-                        )
-                        stats["created"] += 1
-                        sheet_stats["FormulaValues"][step]["Created"] += 1
-                        if defer:
-                            sheet_stats["FormulaValues"][step]["Deferrals"] += 1
-                    seen_fvs.add(fp)
-                else:
-                    log.error(f"{sheet}!Row{r_idx}: unknown TagType '{tagtype}'")
-                    errors.append(f"{sheet}!Row{r_idx}: unknown TagType '{tagtype}'")
-                    continue
+                        msg = f"{sheet}!Row{r_idx}: unknown TagType '{tagtype}'"
+                        log.error("%s", msg)
+                        errors.append(msg)
+                        continue
 
-            # Deletes
-            for node in list(tree.parameters):
-                if node.fullpath not in seen_params:
-                    node.element.getparent().remove(node.element)
-                    tree.parameters.remove(node)
+                # Deletes
+                stale_params = [
+                    n for n in tree.parameters if n.fullpath not in seen_params
+                ]
+                if stale_params:
+                    tree.remove_parameters(stale_params)
+                for node in stale_params:
                     log.debug(
-                        f"\tParameter NOT found in Excel but exists in XML, {node.fullpath} deleted.."
+                        "\tParameter NOT found in Excel but exists in XML, %s deleted..",
+                        node.fullpath,
                     )
                     stats["deleted"] += 1
-                    sheet_stats["Parameters"]["Deleted"] += 1
-            for node in list(tree.formula_values):
-                if node.fullpath not in seen_fvs:
-                    node.element.getparent().remove(node.element)
-                    tree.formula_values.remove(node)
-                    step = node.fullpath.split("/Steps/Step[", 1)[1].split("]")[0]
+                    param_stats["Deleted"] += 1
+                stale_fvs = [
+                    n for n in tree.formula_values if n.fullpath not in seen_fvs
+                ]
+                if stale_fvs:
+                    tree.remove_formulavalues(stale_fvs)
+                for node in stale_fvs:
+                    step = _step(node.fullpath)
 
                     log.debug(
-                        f"\tFormulaValue NOT found in Excel but exists in XML, {node.fullpath} deleted.."
+                        "\tFormulaValue NOT found in Excel but exists in XML, %s deleted..",
+                        node.fullpath,
                     )
                     stats["deleted"] += 1
-                    sheet_stats["FormulaValues"][step]["Deleted"] += 1
-
-            # per‐sheet summary
-            p = sheet_stats["Parameters"]
-            fv_stats = sheet_stats["FormulaValues"]
-            any_sheet_changes = (
-                p["Created"]
-                or p["Updated"]
-                or p["Deleted"]
-                or any(
-                    f["Created"] or f["Updated"] or f["Deleted"]
-                    for f in fv_stats.values()
-                )
-            )
-
-            if any_sheet_changes:
-                log.debug("Changes for '%s'", sheet)
-                log.debug(
-                    "Parameters → Created=%d\tUpdated=%d\tDeleted=%d",
-                    p["Created"],
-                    p["Updated"],
-                    p["Deleted"],
+                    _step_bucket(fv_stats, step)["Deleted"] += 1
+
+                # per‐sheet summary
+                p = param_stats
+                any_sheet_changes = (
+                    p["Created"]
+                    or p["Updated"]
+                    or p["Deleted"]
+                    or any(
+                        f["Created"] or f["Updated"] or f["Deleted"]
+                        for f in fv_stats.values()
+                    )
                 )
-                log.debug("FormulaValues by step:")
-                for step, f in sheet_stats["FormulaValues"].items():
+
+                if any_sheet_changes:
+                    log.debug("Changes for '%s'", sheet)
                     log.debug(
-                        "\t[%s] Created=%d\tUpdated=%d\tOut of which %d are Deferrals\tDeleted=%d",
-                        step,
-                        f["Created"],
-                        f["Updated"],
-                        f["Deferrals"],
-                        f["Deleted"],
+                        "Parameters → Created=%d\tUpdated=%d\tDeleted=%d",
+                        p["Created"],
+                        p["Updated"],
+                        p["Deleted"],
                     )
-                log.debug("------------------------------------------------")
-            sheet_created = p["Created"] + sum(
-                f["Created"] for f in sheet_stats["FormulaValues"].values()
-            )
-            sheet_updated = p["Updated"] + sum(
-                f["Updated"] for f in sheet_stats["FormulaValues"].values()
-            )
-            sheet_deleted = p["Deleted"] + sum(
-                f["Deleted"] for f in sheet_stats["FormulaValues"].values()
-            )
-            _emit(
-                "sheet_done",
-                index=index,
-                total=total_sheets,
-                sheet=sheet,
-                created=sheet_created,
-                updated=sheet_updated,
-                deleted=sheet_deleted,
-            )
+                    log.debug("FormulaValues by step:")
+                    for step, f in sheet_stats["FormulaValues"].items():
+                        log.debug(
+                            "\t[%s] Created=%d\tUpdated=%d\tOut of which %d are Deferrals\tDeleted=%d",
+                            step,
+                            f["Created"],
+                            f["Updated"],
+                            f["Deferrals"],
+                            f["Deleted"],
+                        )
+                    log.debug("------------------------------------------------")
+                sheet_created = p["Created"] + sum(
+                    f["Created"] for f in sheet_stats["FormulaValues"].values()
+                )
+                sheet_updated = p["Updated"] + sum(
+                    f["Updated"] for f in sheet_stats["FormulaValues"].values()
+                )
+                sheet_deleted = p["Deleted"] + sum(
+                    f["Deleted"] for f in sheet_stats["FormulaValues"].values()
+                )
+                _emit(
+                    "sheet_done",
+                    index=index,
+                    total=total_sheets,
+                    sheet=sheet,
+                    created=sheet_created,
+                    updated=sheet_updated,
+                    deleted=sheet_deleted,
+                )
+        finally:
+            wb.close()
 
         if errors:
             raise ValidationError(f"{len(errors)} errors")
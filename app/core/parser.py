@@ -4,10 +4,11 @@ XMLParser: recursively load parent and child XMLs into RecipeTree instances.
 
 import os
 import logging
-from collections import Counter
 from collections.abc import Callable
 from core.xml_model import RecipeTree
-from core.base import NSMAP
+
+# Child recipe extension for each parent extension (procedure -> unit -> operation).
+_CHILD_EXT = {".PXML": ".UXML", ".UXML": ".OXML"}
 
 
 class XMLParser:
@@ -32,17 +33,49 @@ class XMLParser:
         """
         loaded = {}
         discovered_paths = {os.path.abspath(parent_path)}
-        missing_children: Counter[str] = Counter()
+        missing_children: dict[str, int] = {}
+        dir_entries: dict[str, set[str]] = {}
+        # Answer per absolute child path, negatives included, so a reference
+        # that repeats ($NULL, a missing recipe used by many steps) is only
+        # checked against the filesystem once.
+        exists_cache: dict[str, bool] = {}
+        # Sibling recipes tend to reference the same children, so each distinct
+        # reference is resolved to an absolute path only once per parse.
+        resolved: dict[str, str] = {}
         log = logging.getLogger(__name__)
 
         def _emit(event: str, **payload) -> None:
             if progress_cb is not None:
                 progress_cb(event, payload)
 
+        def _exists(path):
+            found = exists_cache.get(path)
+            if found is None:
+                found = exists_cache[path] = _probe(path)
+            return found
+
+        def _probe(path):
+            # List each directory once instead of stat-ing every referenced child;
+            # recipes commonly live on network shares where a stat is a round trip.
+            directory, name = os.path.split(path)
+            entries = dir_entries.get(directory)
+            if entries is None:
+                try:
+                    with os.scandir(directory) as it:
+                        entries = {os.path.normcase(e.name) for e in it}
+                except OSError:
+                    entries = set()
+                dir_entries[directory] = entries
+            if os.path.normcase(name) in entries:
+                return True
+            # Not listed: confirm with the filesystem so case-insensitive volumes
+            # behave exactly like os.path.exists().
+            return os.path.exists(path)
+
         def _load(path):
             abs_path = os.path.abspath(path)
             if abs_path in loaded:
-                return
+                return None
             discovered_paths.add(abs_path)
             log.debug("Parsing XML: %s", abs_path)
             tree = RecipeTree(abs_path)
@@ -50,7 +83,11 @@ class XMLParser:
             loaded[abs_path] = tree
 
             log.debug(
-                f"\tLoaded {os.path.basename(abs_path)}: {len(tree.parameters)} params, {len(tree.formula_values)} formula values, Total = {len(tree.parameters) + len(tree.formula_values)}"
+                "\tLoaded %s: %d params, %d formula values, Total = %d",
+                os.path.basename(abs_path),
+                len(tree.parameters),
+                len(tree.formula_values),
+                len(tree.parameters) + len(tree.formula_values),
             )
             _emit(
                 "loaded",
@@ -60,48 +97,63 @@ class XMLParser:
                 params=len(tree.parameters),
                 formula_values=len(tree.formula_values),
             )
+            return _children(abs_path, tree)
+
+        def _children(abs_path, tree):
+            # Generator: yields each existing child to load next, so its
+            # events interleave with the parent's exactly as in a recursive walk.
             # determine child extension
             ext = os.path.splitext(abs_path)[1].upper()
-            child_ext = {".PXML": ".UXML", ".UXML": ".OXML"}.get(ext)
-            if child_ext:
-                for sr in tree.tree.findall(
-                    f".//{{{NSMAP[None]}}}StepRecipeID", namespaces=NSMAP
-                ):
-                    name = (sr.text or "").strip()
-                    if not name:
-                        continue
-                    child = os.path.abspath(
-                        os.path.join(os.path.dirname(abs_path), name + child_ext)
-                    )
-                    log.debug(
-                        f"\tParent {os.path.basename(abs_path)} - Looking for Child XML: {child}",
-                    )
-                    if os.path.exists(child):
-                        if child not in discovered_paths and child not in loaded:
-                            discovered_paths.add(child)
-                            _emit(
-                                "discovered",
-                                path=child,
-                                loaded=len(loaded),
-                                total=len(discovered_paths),
-                            )
-                        log.debug(
-                            f"\tParent {os.path.basename(abs_path)} - Child found, Parsing Child XML: {child}"
-                        )
-                        _load(child)
-                    else:
-                        missing_children[child] += 1
-                        log.debug(
-                            f"\tParent {os.path.basename(abs_path)} - Child XML not found: {child}"
-                        )
+            child_ext = _CHILD_EXT.get(ext)
+            if not child_ext:
+                return
+            directory, parent_name = os.path.split(abs_path)
+            # StepRecipeID references are collected by extract_nodes()
+            for name in tree.step_recipe_ids:
+                ref = os.path.join(directory, name + child_ext)
+                child = resolved.get(ref)
+                if child is None:
+                    child = resolved[ref] = os.path.abspath(ref)
+                log.debug("\tParent %s - Looking for Child XML: %s", parent_name, child)
+                if _exists(child):
+                    if child not in discovered_paths and child not in loaded:
+                        discovered_paths.add(child)
                         _emit(
-                            "missing_child",
+                            "discovered",
                             path=child,
-                            parent=os.path.basename(abs_path),
-                            count=missing_children[child],
+                            loaded=len(loaded),
+                            total=len(discovered_paths),
                         )
+                    log.debug(
+                        "\tParent %s - Child found, Parsing Child XML: %s",
+                        parent_name,
+                        child,
+                    )
+                    yield child
+                else:
+                    missing_children[child] = missing_children.get(child, 0) + 1
+                    log.debug(
+                        "\tParent %s - Child XML not found: %s", parent_name, child
+                    )
+                    _emit(
+                        "missing_child",
+                        path=child,
+                        parent=parent_name,
+                        count=missing_children[child],
+                    )
 
-        _load(parent_path)
+        # Depth-first walk with an explicit stack of pending-children iterators
+        # rather than recursion, so deep recipe hierarchies cannot hit the
+        # recursion limit; load and event order match a recursive walk.
+        stack = [iter((parent_path,))]
+        while stack:
+            path = next(stack[-1], None)
+            if path is None:
+                stack.pop()
+                continue
+            children = _load(path)
+            if children is not None:
+                stack.append(children)
         if missing_children:
             for child, count in sorted(
                 missing_children.items(),
@@ -111,16 +163,17 @@ class XMLParser:
                     log.warning("Child XML not found: %s", child)
                 else:
                     log.warning("Child XML not found (%dx): %s", count, child)
+        missing_total = sum(missing_children.values())
         log.info(
             "Parsed XML graph: loaded=%d files, discovered=%d references, missing-child occurrences=%d",
             len(loaded),
             len(discovered_paths),
-            sum(missing_children.values()),
+            missing_total,
         )
         _emit(
             "finished",
             loaded=len(loaded),
             total=len(discovered_paths),
-            missing_occurrences=sum(missing_children.values()),
+            missing_occurrences=missing_total,
         )
         return list(loaded.values())
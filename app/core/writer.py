@@ -3,8 +3,35 @@ XMLWriter: serialize updated RecipeTree models back to XML files.
 """
 
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain
 from collections.abc import Callable
+from lxml import etree
+from utils.errors import ValidationError
+
+# libxml2 serializes without holding the GIL, so a few threads overlap the
+# serialization and disk writes of separate recipe files.
+_MAX_WRITE_WORKERS = 8
+
+
+def _write_tree(tree, out_path: str) -> None:
+    # Serialize to one buffer and hand it to the OS directly; a recipe fits in
+    # memory anyway, and this skips the buffered file object entirely. The
+    # encoding is spelled in upper case because tostring() copies it verbatim
+    # into the XML declaration.
+    data = etree.tostring(
+        tree, encoding="UTF-8", xml_declaration=True, pretty_print=True
+    )
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(out_path, flags, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
 
 
 class XMLWriter:
@@ -25,7 +52,9 @@ class XMLWriter:
         alongside the first XML), creates a timestamped directory (YYYY-MM-DD-HHMM), and writes
         each RecipeTree's updated `.tree` to a file of the same name.  Before writing, it calls
         each node's `reorder_children()` to ensure canonical tag order.  The XML is emitted with
-        `utf-8` encoding, an XML declaration, and pretty-printed indentation.  Finally, it returns
+        `utf-8` encoding, an XML declaration, and pretty-printed indentation.  Trees the import
+        left untouched (`dirty` is False) are copied byte-for-byte from their source file
+        instead, so the output folder is still a complete recipe set.  Finally, it returns
         the full path of the created output directory for downstream use or user notification.
 
         Args:
@@ -48,23 +77,54 @@ class XMLWriter:
         )
         stamp = datetime.now().strftime("%Y-%m-%d-%H%M")
         out_dir = os.path.join(root_dir, stamp)
+        # Every output lands directly in out_dir: join the separator once.
+        out_prefix = os.path.join(out_dir, "")
+
+        # Two trees sharing a destination would be written concurrently to
+        # the same file; compare case-insensitively for Windows and macOS.
+        seen = set()
+        for t in trees:
+            key = os.path.normcase(out_prefix + t.filename).casefold()
+            if key in seen:
+                raise ValidationError(
+                    f"Duplicate output file '{t.filename}' from {t.filepath}"
+                )
+            seen.add(key)
+
         os.makedirs(out_dir, exist_ok=True)
 
-        for index, t in enumerate(trees, start=1):
-            for node in t.parameters + t.formula_values:
-                node.reorder_children()
-            fname = os.path.basename(t.filepath)
-            out_path = os.path.join(out_dir, fname)
-            t.tree.write(
-                out_path, encoding="utf-8", xml_declaration=True, pretty_print=True
-            )
-            _emit(
-                "file_written",
-                index=index,
-                total=total,
-                filename=fname,
-                output_path=out_path,
-            )
+        with ThreadPoolExecutor(max_workers=min(_MAX_WRITE_WORKERS, total)) as pool:
+            # Tree mutation stays on this thread; only serialization is handed
+            # to the pool, one document per task.
+            pending = []
+            for t in trees:
+                fname = t.filename
+                out_path = out_prefix + fname
+                if not t.dirty:
+                    # Nothing changed: the source file is already the output.
+                    future = pool.submit(shutil.copyfile, t.filepath, out_path)
+                    pending.append((fname, out_path, future))
+                    continue
+                # Nodes the import already reordered return immediately.
+                for node in chain(t.parameters, t.formula_values):
+                    node.reorder_children()
+                # Drop namespace declarations left unused by edits so libxml2
+                # does not carry them through serialization.
+                etree.cleanup_namespaces(t.root)
+                pending.append(
+                    (fname, out_path, pool.submit(_write_tree, t.tree, out_path))
+                )
+
+            # Report in input order; result() re-raises any write error.
+            for index, (fname, out_path, future) in enumerate(pending, start=1):
+                future.result()
+                _emit(
+                    "file_written",
+                    index=index,
+                    total=total,
+                    filename=fname,
+                    output_path=out_path,
+                )
 
         _emit("finished", total=total, output_dir=out_dir)
         return out_dir
@@ -4,14 +4,163 @@
 XML model: RecipeTree, ParameterNode, FormulaValueNode.
 """
 
+from __future__ import annotations
+
+import os
 import re
+import sys
 import logging
 from lxml import etree
-from lxml.etree import QName
-from core.base import NAMESPACE, NSMAP, EXCEL_COLUMNS
+from core.base import (
+    NSMAP,
+    EXCEL_COLUMNS,
+    FVL_COLUMNS,
+    TAG_NAME,
+    TAG_PARAMETER,
+    TAG_FORMULA_VALUE,
+    TAG_FORMULA_VALUE_LIMIT,
+    TAG_PARAM_EXPRESSION,
+    TAG_RECIPE_ELEMENT_ID,
+    TAG_STEP,
+    TAG_STEPS,
+    TAG_STEP_RECIPE_ID,
+    local_name,
+    qn,
+)
 from utils.errors import ValidationError, TypeConflictError
 from utils.string import safe_strip
 
+# Shared parser for recipe files: no ID table, no entity expansion and no
+# libxml2 size limits on large recipes. Blank text is kept so files
+# round-trip with their original layout.
+_XML_PARSER = etree.XMLParser(
+    huge_tree=True,
+    collect_ids=False,
+    resolve_entities=False,
+    remove_blank_text=False,
+)
+
+
+# Excel columns carrying the <FormulaValueLimit> block share this prefix.
+_FVL_PREFIX = "FormulaValueLimit_"
+
+# Row columns that never map to a direct child element of the node. The fixed
+# FormulaValueLimit_ columns are included so they resolve with one hash lookup;
+# the prefix test only remains as a fallback for extra limit columns.
+_PARAM_SKIP_COLUMNS = frozenset(("TagType", "FullPath", "Defer")) | FVL_COLUMNS
+_FV_SKIP_COLUMNS = frozenset(("TagType", "FullPath", "ParamExpression")) | FVL_COLUMNS
+
+# Blank FormulaValueLimit_ cells for a FormulaValue without a limit block, in
+# EXCEL_COLUMNS order.
+_FVL_BLANK_ROW = dict.fromkeys(
+    (c for c in EXCEL_COLUMNS if c.startswith(_FVL_PREFIX)), ""
+)
+
+# Leading, always-present cells of an exported row. to_excel_row copies one and
+# merges the node's children over it, so extra child tags follow in XML order.
+_PARAM_ROW_TEMPLATE = dict.fromkeys(
+    (
+        "TagType",
+        "Name",
+        "FullPath",
+        "Real",
+        "Integer",
+        "High",
+        "Low",
+        "String",
+        "EnumerationSet",
+        "EnumerationMember",
+        "Defer",
+    ),
+    "",
+)
+_FV_ROW_TEMPLATE = dict.fromkeys(
+    (
+        "TagType",
+        "Name",
+        "FullPath",
+        "Defer",
+        "Value",
+        "ParamExpression",
+        "Real",
+        "Integer",
+        "String",
+        "EnumerationSet",
+        "EnumerationMember",
+    ),
+    "",
+)
+
+# Step name of a FormulaValue FullPath given for a new row.
+_FV_STEP_RE = re.compile(r".*/Steps/Step\[(.*?)\]/FormulaValue\[.*\]$")
+
+# Texts shorter than this (units, flags, enumeration members, small numbers)
+# repeat heavily across a recipe and are interned to share one object.
+_INTERN_MAX_LEN = 32
+
+
+def _child_texts(element: etree.Element) -> dict:
+    """
+    Map each child's local tag name to its raw text, in one pass over the children.
+
+    Tag names and short texts are interned: lxml hands out a fresh string on every
+    access, and a large recipe holds thousands of copies of the same few values.
+    """
+    subs = {}
+    for child in element:
+        text = child.text or ""
+        if len(text) < _INTERN_MAX_LEN:
+            text = sys.intern(text)
+        subs[sys.intern(local_name(child.tag))] = text
+    return subs
+
+
+def _children_by_name(element: etree.Element) -> dict:
+    """
+    Index direct children by local tag name; the first child wins, as with find().
+    """
+    index = {}
+    for child in element:
+        index.setdefault(local_name(child.tag), child)
+    return index
+
+
+def _apply_order(element: etree.Element, children: dict, order: list) -> None:
+    """
+    Make `element`'s children exactly `order` (by local name), taking each from
+    `children` or creating an empty placeholder.
+
+    Children already in place at the front are left attached; only the tail
+    from the first mismatch is detached and re-appended, so a node that is
+    already in canonical order is not touched at all.
+    """
+    target = []
+    for tag in order:
+        el = children.get(tag)
+        if el is None:
+            el = etree.Element(qn(tag))
+        target.append(el)
+    current = list(element)
+    keep = 0
+    for have, want in zip(current, target):
+        if have is not want:
+            break
+        keep += 1
+    if keep < len(current) or keep < len(target):
+        # One slice delete and one extend instead of a remove/append per child.
+        del element[keep:]
+        element.extend(target[keep:])
+
+
+def _last_child(parent: etree.Element, tag: str):
+    """
+    Return the last direct child of `parent` with the given tag, scanning from the end.
+    """
+    for el in reversed(parent):
+        if el.tag == tag:
+            return el
+    return None
+
 
 class NodeBase:
     """
@@ -19,14 +168,41 @@ class NodeBase:
     Stores the original XML element, its full path, and a snapshot of sub-elements.
     """
 
-    def __init__(self, element: etree.Element, fullpath: str, source_file: str):
+    # A recipe graph holds tens of thousands of nodes; slots drop the
+    # per-instance __dict__ and the logger is shared by every node.
+    __slots__ = (
+        "_ordered",
+        "element",
+        "fullpath",
+        "original_subs",
+        "owner",
+        "source_file",
+    )
+    log = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        element: etree.Element,
+        fullpath: str,
+        source_file: str,
+        original_subs: dict | None = None,
+        owner: RecipeTree | None = None,
+    ):
         self.element = element
         self.fullpath = fullpath
         self.source_file = source_file
-        self.original_subs = {
-            QName(child.tag).localname: (child.text or "") for child in element
-        }
-        self.log = logging.getLogger(__name__)
+        self.original_subs = (
+            original_subs if original_subs is not None else _child_texts(element)
+        )
+        # Owning RecipeTree, marked dirty whenever an update changes the element.
+        self.owner = owner
+        # True once reorder_children() has run and no update has touched the
+        # element since; XMLWriter's final reorder then skips the node.
+        self._ordered = False
+
+    def _mark_dirty(self):
+        if self.owner is not None:
+            self.owner.dirty = True
 
     def to_excel_row(self) -> dict:
         raise NotImplementedError
@@ -43,23 +219,13 @@ class ParameterNode(NodeBase):
     Represents a <Parameter> node in the XML tree.
     """
 
+    __slots__ = ()
+
     def to_excel_row(self) -> dict:
-        row = {"TagType": "Parameter", "Name": "", "FullPath": self.fullpath}
-        row["Name"] = self.original_subs.get("Name", "")
-        for col in (
-            "Real",
-            "Integer",
-            "High",
-            "Low",
-            "String",
-            "EnumerationSet",
-            "EnumerationMember",
-        ):
-            row[col] = self.original_subs.get(col, "")
+        row = {**_PARAM_ROW_TEMPLATE, **self.original_subs}
+        row["TagType"] = "Parameter"
+        row["FullPath"] = self.fullpath
         row["Defer"] = ""
-        for k, v in self.original_subs.items():
-            if k not in row:
-                row[k] = v
         # self.log.debug(f"{row}") # Too much logging for now
         return row
 
@@ -82,28 +248,31 @@ class ParameterNode(NodeBase):
         """
 
         changed = False
+        self._ordered = False
+        # Normalize every cell once; validation and the update loop share it.
+        stripped = {k: safe_strip(v) for k, v in row.items()}
 
         # Validate exactly one data-type
         type_fields = ["Real", "Integer", "String", "EnumerationSet"]
-        count = sum(bool(row[f].strip()) for f in type_fields)
+        count = sum(bool(stripped.get(f)) for f in type_fields)
         if count > 2:
             raise TypeConflictError(f"{self.fullpath}: must have exactly one data type")
         try:
+            # One walk over the children replaces a find() per column.
+            existing = _children_by_name(self.element)
             # Loop through each field and create/update as needed
-            for k, new_val in row.items():
-                if k in ("TagType", "FullPath", "Defer") or k.startswith(
-                    "FormulaValueLimit_"
-                ):
+            for k, text in stripped.items():
+                if k in _PARAM_SKIP_COLUMNS or k.startswith(_FVL_PREFIX):
                     continue
-                text = safe_strip(new_val)
 
                 # skip blanks that didn’t originally exist
                 if not text and k not in self.original_subs:
                     continue
-                el = self.element.find(f"{{{NAMESPACE}}}{k}", namespaces=NSMAP)
+                el = existing.get(k)
                 if el is None:
-                    el = etree.SubElement(self.element, f"{{{NAMESPACE}}}{k}")
+                    el = etree.SubElement(self.element, qn(k))
                     el.text = text
+                    existing[k] = el
                     changed = True
                 else:
                     old = safe_strip(el.text)
@@ -112,13 +281,16 @@ class ParameterNode(NodeBase):
                         changed = True
             if changed:
                 self.reorder_children()
+                self._mark_dirty()
             return changed
         except Exception as e:
-            self.log.debug(f"\t\t Failed on Row:{row}")
+            self.log.debug("\t\t Failed on Row:%s", row)
             raise e
 
     def reorder_children(self):
-        children = {QName(c.tag).localname: c for c in self.element}
+        if self._ordered:
+            return
+        children = {local_name(c.tag): c for c in self.element}
         if "String" in children:
             order = ["Name", "ERPAlias", "PLCReference", "String", "EngineeringUnits"]
         elif "Integer" in children:
@@ -153,13 +325,8 @@ class ParameterNode(NodeBase):
             ]
         else:
             raise ValidationError(f"{self.fullpath}: no recognized type")
-        for c in list(self.element):
-            self.element.remove(c)
-        for tag in order:
-            el = children.get(tag)
-            if el is None:
-                el = etree.Element(f"{{{NAMESPACE}}}{tag}")
-            self.element.append(el)
+        _apply_order(self.element, children, order)
+        self._ordered = True
 
 
 class FormulaValueNode(NodeBase):
@@ -167,14 +334,16 @@ class FormulaValueNode(NodeBase):
     Represents a <FormulaValue> node in the XML tree.
     """
 
+    __slots__ = ()
+
     def to_excel_row(self) -> dict:
-        row = {"TagType": "FormulaValue", "Name": "", "FullPath": self.fullpath}
-        row["Name"] = self.original_subs.get("Name", "")
-        # always include Defer
-        defer = self.original_subs.get("Defer", "")
-        row["Defer"] = defer
+        # Child texts fill Name, Defer, Value and the data-type cells directly.
+        row = {**_FV_ROW_TEMPLATE, **self.original_subs}
+        row["TagType"] = "FormulaValue"
+        row["FullPath"] = self.fullpath
         # default Value only when no defer
-        row["Value"] = "" if defer else self.original_subs.get("Value", "")
+        if self.original_subs.get("Defer", ""):
+            row["Value"] = ""
 
         # handle ParamExpression cases
         expr_present = "ParamExpression" in self.original_subs
@@ -191,31 +360,16 @@ class FormulaValueNode(NodeBase):
             row[dtype] = "ParamExpression"
             row["ParamExpression"] = self.original_subs.get(dtype, "")
         else:
-            # standard case: just emit the raw values
+            # standard case: the raw values are already in place
             row["ParamExpression"] = ""
-            for t in (
-                "Real",
-                "Integer",
-                "String",
-                "EnumerationSet",
-                "EnumerationMember",
-            ):
-                row[t] = self.original_subs.get(t, "")
-        # for col in ("Real", "Integer", "String", "EnumerationSet", "EnumerationMember"):
-        #     row[col] = self.original_subs.get(col, "")
-        fvl = self.element.find(f"{{{NAMESPACE}}}FormulaValueLimit", namespaces=NSMAP)
+        fvl = self.element.find(TAG_FORMULA_VALUE_LIMIT)
         if fvl is not None:
             row["FormulaValueLimit_Verification"] = fvl.get("Verification", "")
             for child in fvl:
-                name = QName(child.tag).localname
-                row[f"FormulaValueLimit_{name}"] = child.text or ""
+                name = local_name(child.tag)
+                row[_FVL_PREFIX + name] = child.text or ""
         else:
-            for col in EXCEL_COLUMNS:
-                if col.startswith("FormulaValueLimit_"):
-                    row[col] = ""
-        for k, v in self.original_subs.items():
-            if k not in row:
-                row[k] = v
+            row.update(_FVL_BLANK_ROW)
         # self.log.debug(f"{row}") # Too much logging for now
         return row
 
@@ -239,13 +393,17 @@ class FormulaValueNode(NodeBase):
         `ValidationError` or `DeferResolutionError`.
         """
         changed = False
+        self._ordered = False
+        # Normalize every cell once; validation and the update loop share it.
+        stripped = {k: safe_strip(v) for k, v in row.items()}
+        defer = stripped.get("Defer", "")
 
         # detect if user is setting up an expression
-        expr_text = safe_strip(row.get("ParamExpression", ""))
+        expr_text = stripped.get("ParamExpression", "")
         # check if one of the dtype‐columns is literally "ParamExpression"
         expr_dtype = None
         for t in ("Real", "Integer", "String"):
-            if safe_strip(row.get(t, "")) == "ParamExpression":
+            if stripped.get(t, "") == "ParamExpression":
                 expr_dtype = t
                 break
         if expr_dtype and not expr_text:
@@ -255,20 +413,22 @@ class FormulaValueNode(NodeBase):
             )
 
         type_fields = ["Real", "Integer", "String", "EnumerationSet", "Defer"]
-        count = sum(bool(safe_strip(row[f])) for f in type_fields)
+        count = sum(bool(stripped.get(f)) for f in type_fields)
         if count > 2:
             raise TypeConflictError(f"{self.fullpath}: must have exactly one data type")
+        # Split off the columns that never map to a direct child in one pass:
+        # row bookkeeping, the expression text and the FormulaValueLimit block.
+        fields = [
+            (k, text)
+            for k, text in stripped.items()
+            if k not in _FV_SKIP_COLUMNS and not k.startswith(_FVL_PREFIX)
+        ]
         try:
-            for k, new_val in row.items():
-                if k.startswith("FormulaValueLimit_") or k in (
-                    "TagType",
-                    "FullPath",
-                    "ParamExpression",
-                ):
-                    continue
-                text = safe_strip(new_val)
+            # One walk over the children replaces a find() per column.
+            existing = _children_by_name(self.element)
+            for k, text in fields:
                 #  skip Value if Defer set, skip Defer if blank
-                if k == "Value" and row.get("Defer", "").strip():
+                if k == "Value" and defer:
                     continue
                 if k == "Defer" and not text:
                     continue
@@ -277,10 +437,11 @@ class FormulaValueNode(NodeBase):
                 # skip blanks that didn’t originally exist
                 if not text and k not in self.original_subs:
                     continue
-                el = self.element.find(f"{{{NAMESPACE}}}{k}", namespaces=NSMAP)
+                el = existing.get(k)
                 if el is None:
-                    el = etree.SubElement(self.element, f"{{{NAMESPACE}}}{k}")
+                    el = etree.SubElement(self.element, qn(k))
                     el.text = text
+                    existing[k] = el
                     changed = True
                 else:
                     old = safe_strip(el.text)
@@ -291,30 +452,22 @@ class FormulaValueNode(NodeBase):
             # handle ParamExpression
             if expr_dtype:
                 # ensure an empty <ParamExpression/> tag exists
-                expr_el = self.element.find(
-                    f"{{{NAMESPACE}}}ParamExpression", namespaces=NSMAP
-                )
-                if expr_el is None:
-                    expr_el = etree.SubElement(
-                        self.element, f"{{{NAMESPACE}}}ParamExpression"
-                    )
+                if "ParamExpression" not in existing:
+                    etree.SubElement(self.element, TAG_PARAM_EXPRESSION)
                     changed = True
                 # now write the actual expression into the dtype element
-                dtype_el = self.element.find(
-                    f"{{{NAMESPACE}}}{expr_dtype}", namespaces=NSMAP
-                )
+                dtype_el = existing.get(expr_dtype)
                 if dtype_el is None:
-                    dtype_el = etree.SubElement(
-                        self.element, f"{{{NAMESPACE}}}{expr_dtype}"
-                    )
+                    dtype_el = etree.SubElement(self.element, qn(expr_dtype))
                 if safe_strip(dtype_el.text) != expr_text:
                     dtype_el.text = expr_text
                     changed = True
             if changed:
                 self.reorder_children()
+                self._mark_dirty()
             return changed
         except Exception as e:
-            self.log.debug(f"\t\t Failed on Row:{row}")
+            self.log.debug("\t\t Failed on Row:%s", row)
             raise e
 
     def reorder_children(self):
@@ -324,14 +477,16 @@ class FormulaValueNode(NodeBase):
         The sequence enforced is: Name, Display, either Defer or Value, the single data-type
         element (Integer, Real, String, or EnumerationSet), the optional EnumerationMember,
         EngineeringUnits, and finally the `<FormulaValueLimit>` block (if present).  It first
-        builds a map of existing child elements by localname, removes all from the parent, and
-        then reattaches them in the specified order—creating empty placeholders for any
-        required tags that were missing.  This guarantees that even after updates or creations,
-        the resulting XML files are schema-compliant and machine-diff-friendly.  Missing
-        required children raise `ValidationError`.
+        builds a map of existing child elements by localname, detaches them from the first
+        out-of-place child onward, and reattaches them in the specified order—creating empty
+        placeholders for any required tags that were missing.  This guarantees that even after
+        updates or creations, the resulting XML files are schema-compliant and
+        machine-diff-friendly.  Missing required children raise `ValidationError`.
         """
+        if self._ordered:
+            return
 
-        children = {QName(c.tag).localname: c for c in self.element}
+        children = {local_name(c.tag): c for c in self.element}
         has_defer = "Defer" in children
         has_expression = "ParamExpression" in children
         order = ["Name", "Display"]
@@ -354,13 +509,8 @@ class FormulaValueNode(NodeBase):
         if "FormulaValueLimit" in children:
             order.append("FormulaValueLimit")
         # order.extend(["EngineeringUnits", "FormulaValueLimit"])
-        for c in list(self.element):
-            self.element.remove(c)
-        for tag in order:
-            el = children.get(tag)
-            if el is None:
-                el = etree.Element(f"{{{NAMESPACE}}}{tag}")
-            self.element.append(el)
+        _apply_order(self.element, children, order)
+        self._ordered = True
 
 
 class RecipeTree:
@@ -370,35 +520,122 @@ class RecipeTree:
 
     def __init__(self, path: str):
         self.filepath = path
-        self.tree = etree.parse(path)
+        # Sheet name in the workbook and file name in the output folder; interned
+        # since it keys the importer's sheet lookup.
+        self.filename = sys.intern(os.path.basename(path))
+        self.tree = etree.parse(path, _XML_PARSER)
         self.root = self.tree.getroot()
         self.parameters = []
         self.formula_values = []
+        self.step_recipe_ids = []
+        self._steps_by_name = None
+        # FullPath -> node lookups for the importer, built on first use.
+        self._params_by_path = None
+        self._fvs_by_path = None
+        # Set by every edit made through this tree or its nodes (create, remove,
+        # an update that changes something); XMLWriter copies clean files
+        # verbatim instead of re-serializing them.
+        self.dirty = False
         self.log = logging.getLogger(__name__)
 
     def extract_nodes(self):
-        rid_el = self.root.find(f"{{{NAMESPACE}}}RecipeElementID", namespaces=NSMAP)
-        rid = (rid_el.text or "") if rid_el is not None else ""
-        for p in self.root.findall(f"{{{NAMESPACE}}}Parameter", namespaces=NSMAP):
-            name = p.find(f"{{{NAMESPACE}}}Name", namespaces=NSMAP).text or ""
-            fp = f"{rid}/Parameter[{name}]"
-            # self.log.debug(f"\t\tFound {fp}") # Too much logging for now
-            self.parameters.append(ParameterNode(p, fp, self.filepath))
-        for fv in self.root.findall(
-            f".//{{{NAMESPACE}}}FormulaValue", namespaces=NSMAP
-        ):
-            step = fv.getparent()
-            step_name = step.find(f"{{{NAMESPACE}}}Name", namespaces=NSMAP).text or ""
-            name = fv.find(f"{{{NAMESPACE}}}Name", namespaces=NSMAP).text or ""
-            fp = f"{rid}/Steps/Step[{step_name}]/FormulaValue[{name}]"
-            # self.log.debug(f"\t\tFound {fp}") # Too much logging for now
-            self.formula_values.append(FormulaValueNode(fv, fp, self.filepath))
+        rid = self.root.findtext(TAG_RECIPE_ELEMENT_ID) or ""
+        # FullPath prefixes are built once (per file, per Step) so each node
+        # only appends its own name.
+        param_prefix = f"{rid}/Parameter["
+        step_prefixes = {}
+        # Single pass over the document for both node kinds plus the child recipe
+        # references used by XMLParser (document order is kept within each list).
+        for el in self.root.iter(TAG_PARAMETER, TAG_FORMULA_VALUE, TAG_STEP_RECIPE_ID):
+            if el.tag == TAG_STEP_RECIPE_ID:
+                ref = (el.text or "").strip()
+                if ref:
+                    self.step_recipe_ids.append(ref)
+                continue
+            parent = el.getparent()
+            is_param = el.tag == TAG_PARAMETER
+            # Only top-level parameters; Formulations/ParameterList has its own.
+            if is_param and parent is not self.root:
+                continue
+            # One walk over the children yields both the snapshot and the name.
+            subs = _child_texts(el)
+            name = subs.get("Name", "")
+            if is_param:
+                fp = sys.intern(param_prefix + name + "]")
+                # self.log.debug(f"\t\tFound {fp}") # Too much logging for now
+                self.parameters.append(ParameterNode(el, fp, self.filepath, subs, self))
+            else:
+                prefix = step_prefixes.get(parent)
+                if prefix is None:
+                    step_name = parent.findtext(TAG_NAME) or ""
+                    prefix = f"{rid}/Steps/Step[{step_name}]/FormulaValue["
+                    step_prefixes[parent] = prefix
+                fp = sys.intern(prefix + name + "]")
+                # self.log.debug(f"\t\tFound {fp}") # Too much logging for now
+                self.formula_values.append(
+                    FormulaValueNode(el, fp, self.filepath, subs, self)
+                )
+
+    def _find_step(self, step_name: str):
+        """
+        Look up a <Step> by name through an index built on first use.
+
+        Steps are never added or removed by the editor, so the index stays valid for
+        the lifetime of the tree.  The first Step with a given name wins.
+        """
+        if self._steps_by_name is None:
+            index = {}
+            for step in self.root.iter(TAG_STEP):
+                name_el = step.find(TAG_NAME)
+                if name_el is not None:
+                    index.setdefault(name_el.text, step)
+            self._steps_by_name = index
+        return self._steps_by_name.get(step_name)
+
+    @staticmethod
+    def _index_by_path(nodes: list) -> dict:
+        # First node with a given FullPath wins, like a front-to-back scan.
+        index = {}
+        for node in nodes:
+            index.setdefault(node.fullpath, node)
+        return index
 
     def find_parameter(self, fullpath: str):
-        return next((p for p in self.parameters if p.fullpath == fullpath), None)
+        if self._params_by_path is None:
+            self._params_by_path = self._index_by_path(self.parameters)
+        return self._params_by_path.get(fullpath)
 
     def find_formulavalue(self, fullpath: str):
-        return next((f for f in self.formula_values if f.fullpath == fullpath), None)
+        if self._fvs_by_path is None:
+            self._fvs_by_path = self._index_by_path(self.formula_values)
+        return self._fvs_by_path.get(fullpath)
+
+    @staticmethod
+    def _detach(nodes: list, tracked: list) -> list:
+        # Remove the elements, then rebuild the tracked list in one pass rather
+        # than a list.remove() scan per node.
+        for node in nodes:
+            node.element.getparent().remove(node.element)
+        gone = {id(node) for node in nodes}
+        return [node for node in tracked if id(node) not in gone]
+
+    def remove_parameters(self, nodes: list):
+        """
+        Detach the given <Parameter> nodes from the document and stop tracking them.
+        """
+        if nodes:
+            self.parameters = self._detach(nodes, self.parameters)
+            self._params_by_path = None
+            self.dirty = True
+
+    def remove_formulavalues(self, nodes: list):
+        """
+        Detach the given <FormulaValue> nodes from their Steps and stop tracking them.
+        """
+        if nodes:
+            self.formula_values = self._detach(nodes, self.formula_values)
+            self._fvs_by_path = None
+            self.dirty = True
 
     def has_parameter_named(self, name: str) -> bool:
         return any(p.original_subs.get("Name", "") == name for p in self.parameters)
@@ -410,18 +647,15 @@ class RecipeTree:
         Returns the newly created ParameterNode.
         """
         # 1) Build a fresh <Parameter> element (empty)
-        new_el = etree.Element(f"{{{NAMESPACE}}}Parameter", nsmap=NSMAP)
+        new_el = etree.Element(TAG_PARAMETER, nsmap=NSMAP)
 
         # 2) Locate last existing <Parameter> under root
-        existing = list(
-            self.root.findall(f"{{{NAMESPACE}}}Parameter", namespaces=NSMAP)
-        )
-        if existing:
-            last = existing[-1]
+        last = _last_child(self.root, TAG_PARAMETER)
+        if last is not None:
             self.root.insert(self.root.index(last) + 1, new_el)
         else:
             # if no <Parameter> found, insert before <Steps> if present
-            steps = self.root.find(f"{{{NAMESPACE}}}Steps", namespaces=NSMAP)
+            steps = self.root.find(TAG_STEPS)
             if steps is not None:
                 self.root.insert(self.root.index(steps), new_el)
             else:
@@ -429,24 +663,26 @@ class RecipeTree:
                 self.root.append(new_el)
 
         # 3) Wrap in our Node class, apply data, track it
-        node = ParameterNode(new_el, row["FullPath"], self.filepath)
+        node = ParameterNode(new_el, row["FullPath"], self.filepath, owner=self)
         _ = node.update_from_dict(row)  # always True on new
         self.parameters.append(node)
+        self.dirty = True
+        if self._params_by_path is not None:
+            self._params_by_path.setdefault(node.fullpath, node)
         return node
 
     def create_formulavalue(self, row: dict):
-        m = re.match(r".*/Steps/Step\[(.*?)\]/FormulaValue\[.*\]$", row["FullPath"])
+        m = _FV_STEP_RE.match(row["FullPath"])
         if not m:
             raise ValidationError(f"{row['FullPath']}: cannot parse step")
         step_name = m.group(1)
-        step_el = next(
-            s
-            for s in self.root.findall(f".//{{{NAMESPACE}}}Step", namespaces=NSMAP)
-            if s.find(f"{{{NAMESPACE}}}Name", namespaces=NSMAP).text == step_name
-        )
+        step_el = self._find_step(step_name)
         if step_el is None:
             raise ValidationError(f"Step '{step_name}' not found")
-        el = etree.SubElement(step_el, f"{{{NAMESPACE}}}FormulaValue")
-        node = FormulaValueNode(el, row["FullPath"], self.filepath)
+        el = etree.SubElement(step_el, TAG_FORMULA_VALUE)
+        node = FormulaValueNode(el, row["FullPath"], self.filepath, owner=self)
         node.update_from_dict(row)
         self.formula_values.append(node)
+        self.dirty = True
+        if self._fvs_by_path is not None:
+            self._fvs_by_path.setdefault(node.fullpath, node)
@@ -8,7 +8,10 @@ def safe_strip(val):
     Safely strip a value, converting non-string types to string first.
     Handles None, booleans, numbers, and other types gracefully.
     """
-    if val is None:
+    # Text cells are by far the most common input, so test for them first.
+    if type(val) is str:
+        return val.strip()
+    elif val is None:
         return ""
     elif isinstance(val, bool):
         return str(val)
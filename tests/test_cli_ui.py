@@ -31,6 +31,9 @@ def test_progress_callbacks_run_without_exceptions() -> None:
         ui.on_parse_progress("finished", {"loaded": 4, "total": 4})
 
         ui.on_import_progress("start", {"total": 2})
+        ui.on_import_progress(
+            "row_progress", {"index": 1, "total": 2, "sheet": "A", "rows": 1024}
+        )
         ui.on_import_progress("sheet_done", {"index": 1, "total": 2, "sheet": "A"})
         ui.on_import_progress("sheet_done", {"index": 2, "total": 2, "sheet": "B"})
         ui.on_import_progress("finished", {"total": 2})
@@ -11,6 +11,7 @@ from core.exporter import ExcelExporter
 from core.importer import ExcelImporter
 from core.writer import XMLWriter
 from core.base import NAMESPACE
+from utils.errors import ValidationError
 
 SAMPLE_XML = f"""<?xml version="1.0" encoding="UTF-8"?>
 <RecipeElement xmlns="{NAMESPACE}">
@@ -66,6 +67,19 @@ def sample_pxml(tmp_path):
     return str(p)
 
 
+@pytest.fixture
+def exported_workbook(sample_pxml, tmp_path):
+    """Parse the sample, export it, and open the workbook for editing.
+
+    Returns (trees, excel_file, wb); tests edit `wb` and save it back to
+    `excel_file` before importing.
+    """
+    trees = XMLParser().parse(sample_pxml)
+    excel_file = str(tmp_path / "out.xlsx")
+    ExcelExporter().export(trees, excel_file)
+    return trees, excel_file, load_workbook(excel_file)
+
+
 def local_name(el):
     """Strip namespace and return just the tag's local name."""
     return el.tag.split("}", 1)[-1]
@@ -182,3 +196,216 @@ def test_excel2xml_full_flow(sample_pxml, tmp_path):
 
     # Cleanup
     shutil.rmtree(out_dir)
+
+
+def _append_row(ws, values):
+    """Append one data row (given as a column->value dict) to an exported sheet."""
+    header = [c.value for c in ws[1]]
+    ws.append([values.get(col, "") for col in header])
+
+
+def test_excel2xml_creates_formulavalue_in_named_step(exported_workbook):
+    """A new FormulaValue row is created under the Step named in its FullPath."""
+    trees, excel_file, wb = exported_workbook
+    _append_row(
+        wb["TEST.pxml"],
+        {
+            "TagType": "FormulaValue",
+            "Name": "FV2",
+            "FullPath": "TEST/Steps/Step[Step1]/FormulaValue[FV2]",
+            "Integer": "7",
+        },
+    )
+    wb.save(excel_file)
+
+    stats = ExcelImporter().import_changes(excel_file, trees)
+    assert stats["created"] == 1
+
+    ns = {"ns": NAMESPACE}
+    fv2 = trees[0].root.find(
+        "ns:Steps/ns:Step[ns:Name='Step1']/ns:FormulaValue[ns:Name='FV2']",
+        namespaces=ns,
+    )
+    assert fv2 is not None
+    assert fv2.find("ns:Integer", namespaces=ns).text == "7"
+
+
+def test_excel2xml_unknown_step_raises_validation_error(exported_workbook):
+    """A FormulaValue row pointing at a missing Step is a validation error."""
+    trees, excel_file, wb = exported_workbook
+    _append_row(
+        wb["TEST.pxml"],
+        {
+            "TagType": "FormulaValue",
+            "Name": "FV9",
+            "FullPath": "TEST/Steps/Step[NoSuchStep]/FormulaValue[FV9]",
+            "Integer": "1",
+        },
+    )
+    wb.save(excel_file)
+
+    with pytest.raises(ValidationError):
+        ExcelImporter().import_changes(excel_file, trees)
+
+
+def test_excel2xml_unchanged_file_is_copied_verbatim(
+    exported_workbook, sample_pxml, tmp_path
+):
+    """A recipe the import did not touch is written out as its original bytes."""
+    trees, excel_file, _ = exported_workbook
+
+    stats = ExcelImporter().import_changes(excel_file, trees)
+    assert stats == {"created": 0, "updated": 0, "deleted": 0}
+    assert trees[0].dirty is False
+
+    out_dir = XMLWriter().write(trees, base_dir=str(tmp_path / "out"))
+    with open(os.path.join(out_dir, "TEST.pxml"), "rb") as fh:
+        written = fh.read()
+    with open(sample_pxml, "rb") as fh:
+        assert written == fh.read()
+
+
+def test_model_api_edits_are_written(sample_pxml, tmp_path):
+    """Edits made directly on the model, without ExcelImporter, reach the output."""
+    trees = XMLParser().parse(sample_pxml)
+    tree = trees[0]
+    node = tree.find_parameter("TEST/Parameter[Param2]")
+    row = node.to_excel_row()
+    row["Integer"] = "7"
+    assert node.update_from_dict(row)
+    tree.remove_formulavalues(list(tree.formula_values))
+    assert tree.dirty is True
+
+    out_dir = XMLWriter().write(trees, base_dir=str(tmp_path / "out"))
+    root = etree.parse(os.path.join(out_dir, "TEST.pxml")).getroot()
+    ns = {"ns": NAMESPACE}
+    assert (
+        root.findtext("ns:Parameter[ns:Name='Param2']/ns:Integer", namespaces=ns) == "7"
+    )
+    assert root.find(".//ns:FormulaValue", namespaces=ns) is None
+
+
+def test_writer_rejects_duplicate_output_names(sample_pxml, tmp_path):
+    """Two recipes whose names differ only in case cannot share an output file."""
+    other = tmp_path / "sub"
+    other.mkdir()
+    shutil.copy(sample_pxml, other / "test.PXML")
+    trees = XMLParser().parse(sample_pxml) + XMLParser().parse(str(other / "test.PXML"))
+
+    with pytest.raises(ValidationError, match="Duplicate output file"):
+        XMLWriter().write(trees, base_dir=str(tmp_path / "out"))
+    assert not (tmp_path / "out").exists()
+
+
+def test_excel2xml_defer_target_listed_after_formulavalue(exported_workbook):
+    """A Defer target resolves even when its Parameter row comes later in the sheet."""
+    trees, excel_file, wb = exported_workbook
+
+    # Defer FV1 to a parameter whose row is appended after all FormulaValue rows.
+    ws = wb["TEST.pxml"]
+    header = [c.value for c in ws[1]]
+    fv_row = next(r for r in ws.iter_rows(min_row=2) if r[0].value == "FormulaValue")
+    fv_row[header.index("Defer")].value = "Param9"
+    _append_row(
+        ws,
+        {
+            "TagType": "Parameter",
+            "Name": "Param9",
+            "FullPath": "TEST/Parameter[Param9]",
+            "Integer": "3",
+        },
+    )
+    wb.save(excel_file)
+
+    stats = ExcelImporter().import_changes(excel_file, trees)
+    assert stats["created"] == 1
+    assert stats["updated"] == 1
+
+
+def test_excel2xml_defer_target_with_numeric_name(exported_workbook):
+    """A Parameter Name stored as a number still resolves as a Defer target."""
+    trees, excel_file, wb = exported_workbook
+
+    ws = wb["TEST.pxml"]
+    header = [c.value for c in ws[1]]
+    fv_row = next(r for r in ws.iter_rows(min_row=2) if r[0].value == "FormulaValue")
+    fv_row[header.index("Defer")].value = "42"
+    _append_row(
+        ws,
+        {
+            "TagType": "Parameter",
+            "Name": 42,
+            "FullPath": "TEST/Parameter[42]",
+            "Integer": "3",
+        },
+    )
+    wb.save(excel_file)
+
+    stats = ExcelImporter().import_changes(excel_file, trees)
+    assert stats["created"] == 1
+    assert stats["updated"] == 1
+
+
+def test_excel2xml_defer_target_on_rejected_row(exported_workbook):
+    """A Parameter row that fails validation is not a valid Defer target."""
+    trees, excel_file, wb = exported_workbook
+
+    ws = wb["TEST.pxml"]
+    header = [c.value for c in ws[1]]
+    fv_row = next(r for r in ws.iter_rows(min_row=2) if r[0].value == "FormulaValue")
+    fv_row[header.index("Defer")].value = "Param9"
+    _append_row(
+        ws,
+        {
+            "TagType": "Parameter",
+            "Name": "Param9",
+            "FullPath": "TEST/Parameter[Param9]",
+            "Real": "1.5",
+            "Integer": "3",
+            "String": "x",
+        },
+    )
+    wb.save(excel_file)
+
+    # One error for the Parameter row, one for the FormulaValue deferring to it.
+    with pytest.raises(ValidationError, match="2 errors"):
+        ExcelImporter().import_changes(excel_file, trees)
+
+
+def test_excel2xml_ignores_blank_rows(exported_workbook):
+    """Formatted but empty rows below the data are not reported as bad TagTypes."""
+    trees, excel_file, wb = exported_workbook
+    ws = wb["TEST.pxml"]
+    blank = ws.max_row + 2
+    ws.cell(row=blank, column=1).number_format = "@"
+    ws.cell(row=blank, column=ws.max_column).number_format = "@"
+    wb.save(excel_file)
+
+    stats = ExcelImporter().import_changes(excel_file, trees)
+    assert stats == {"created": 0, "updated": 0, "deleted": 0}
+
+
+def test_excel2xml_reports_row_progress(exported_workbook):
+    """Large sheets emit row_progress ticks with the sheet name and rows reached."""
+    trees, excel_file, wb = exported_workbook
+
+    # Repeat an unchanged Parameter row until the sheet spans two ticks.
+    ws = wb["TEST.pxml"]
+    param_row = [c.value for c in ws[2]]
+    for _ in range(2100):
+        ws.append(param_row)
+    data_rows = ws.max_row - 1
+    wb.save(excel_file)
+
+    ticks = []
+
+    def on_progress(event, payload):
+        if event == "row_progress":
+            ticks.append(payload)
+
+    ExcelImporter().import_changes(excel_file, trees, progress_cb=on_progress)
+
+    assert [t["rows"] for t in ticks] == [1024, 2048]
+    assert all(t["sheet"] == "TEST.pxml" for t in ticks)
+    assert all(t["index"] == 1 and t["total"] == 1 for t in ticks)
+    assert ticks[-1]["rows"] <= data_rows
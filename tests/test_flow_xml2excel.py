@@ -1,5 +1,7 @@
 # tests/test_flow_xml2excel.py
 
+import os
+
 import pytest
 from openpyxl import load_workbook
 
@@ -167,3 +169,30 @@ def test_full_xml2excel_flow(sample_pxml, tmp_path):
 
     # Done
     print("✅ Full xml→excel workflow test passed")
+
+
+def test_missing_child_checked_once(tmp_path, monkeypatch):
+    """A child referenced by several steps but absent is only probed once."""
+    steps = "".join(
+        f"<Step><Name>$NULL:{i}</Name><StepRecipeID>$NULL</StepRecipeID></Step>"
+        for i in range(3)
+    )
+    p = tmp_path / "TEST.pxml"
+    p.write_text(
+        f'<RecipeElement xmlns="{NAMESPACE}"><RecipeElementID>TEST</RecipeElementID>'
+        f"<Steps>{steps}</Steps></RecipeElement>",
+        encoding="utf-8",
+    )
+    probed = []
+    real_exists = os.path.exists
+
+    def counting_exists(path):
+        probed.append(path)
+        return real_exists(path)
+
+    monkeypatch.setattr(os.path, "exists", counting_exists)
+    events = []
+    XMLParser().parse(str(p), progress_cb=lambda e, payload: events.append(e))
+
+    assert events.count("missing_child") == 3
+    assert len([q for q in probed if q.upper().endswith("$NULL.UXML")]) == 1